@@ -57,6 +57,7 @@ def initialize_extensions(app: DifyApp):
         ext_redis,
         ext_request_logging,
         ext_sentry,
+        ext_server_timing,
         ext_set_secretkey,
         ext_storage,
         ext_timezone,
@@ -87,6 +88,7 @@ def initialize_extensions(app: DifyApp):
         ext_commands,
         ext_otel,
         ext_request_logging,
+        ext_server_timing,
     ]
     for ext in extensions:
         short_name = ext.__name__.split(".")[-1]
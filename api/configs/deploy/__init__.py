@@ -23,6 +23,11 @@ class DeploymentConfig(BaseSettings):
         default=False,
     )
 
+    ENABLE_SERVER_TIMING: bool = Field(
+        description="Emit Server-Timing headers with per-stage handler timings",
+        default=False,
+    )
+
     EDITION: str = Field(
         description="Deployment edition of the application (e.g., 'SELF_HOSTED', 'CLOUD')",
         default="SELF_HOSTED",
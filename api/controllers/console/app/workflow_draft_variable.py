@@ -1,9 +1,14 @@
+import base64
+import datetime
+import hashlib
+import json
 import logging
+from collections.abc import Callable, Mapping, Sequence
 from typing import Any, NoReturn
 
-from flask import Response
+import orjson
+from flask import Response, request, stream_with_context
 from flask_restful import Resource, fields, inputs, marshal, marshal_with, reqparse
-from sqlalchemy.orm import Session
 from werkzeug.exceptions import Forbidden
 
 from controllers.console import api
@@ -17,12 +22,18 @@ from core.variables.segment_group import SegmentGroup
 from core.variables.segments import ArrayFileSegment, FileSegment, Segment
 from core.variables.types import SegmentType
 from core.workflow.constants import CONVERSATION_VARIABLE_NODE_ID, SYSTEM_VARIABLE_NODE_ID
+from extensions.ext_server_timing import stage
 from factories.file_factory import build_from_mapping, build_from_mappings
 from factories.variable_factory import build_segment_with_type
 from libs.login import current_user, login_required
 from models import App, AppMode, db
+from models.enums import DraftVariableType
 from models.workflow import WorkflowDraftVariable
-from services.workflow_draft_variable_service import WorkflowDraftVariableList, WorkflowDraftVariableService
+from services.workflow_draft_variable_service import (
+    VariableNotFoundError,
+    WorkflowDraftVariableList,
+    WorkflowDraftVariableService,
+)
 from services.workflow_service import WorkflowService
 
 logger = logging.getLogger(__name__)
@@ -65,23 +76,163 @@ def _create_pagination_parser():
         help="the page of data requested",
     )
     parser.add_argument("limit", type=inputs.int_range(1, 100), required=False, default=20, location="args")
+    parser.add_argument(
+        "cursor",
+        type=str,
+        required=False,
+        default=None,
+        location="args",
+        help="opaque cursor of the last item in the previous page, supersedes `page` when given",
+    )
+    parser.add_argument(
+        "include_total",
+        type=inputs.boolean,
+        required=False,
+        default=False,
+        location="args",
+        help="whether to include the total number of variables, which requires an extra COUNT query",
+    )
     return parser
 
 
+# Parsers are stateless once built (`parse_args` only reads the current
+# request), so a single module-level instance serves all requests instead of
+# reconstructing the parser and its arguments per call.
+_PAGINATION_PARSER = _create_pagination_parser()
+
+# Deepest row OFFSET pagination may reach. Postgres executes `OFFSET n` by
+# scanning and discarding n rows, so deep pages cost O(page * limit) per
+# request; clients needing to go deeper must use the cursor parameter, which
+# costs O(limit) at any depth.
+_MAX_OFFSET_ROWS = 10_000
+
+
+def _encode_cursor(created_at: datetime.datetime, variable_id: str) -> str:
+    # The cursor encodes the sort key `(created_at, id)` of the last row in the
+    # current page, allowing the next page to be fetched with a keyset predicate
+    # instead of an ever-growing OFFSET scan.
+    return base64.urlsafe_b64encode(orjson.dumps((created_at.isoformat(), variable_id))).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+    try:
+        created_at_str, variable_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.datetime.fromisoformat(created_at_str), str(variable_id)
+    # `ValueError` covers `binascii.Error` from `urlsafe_b64decode`,
+    # `orjson.JSONDecodeError` and a malformed timestamp; `TypeError` covers
+    # payloads of the wrong shape, such as a non-sequence or a non-string
+    # timestamp element.
+    except (ValueError, TypeError):
+        raise InvalidArgumentError(description=f"invalid cursor: {cursor}")
+
+
 def _serialize_variable_type(workflow_draft_var: WorkflowDraftVariable) -> str:
     value_type = workflow_draft_var.value_type
     return value_type.exposed_type().value
 
 
+# The serializers below are plain-dict equivalents of the marshal field dicts
+# and are used on the hot list endpoints, where `marshal` + `fields.Nested`
+# attribute resolution is measurably slower than direct attribute access.
+# Keep them in sync with `_WORKFLOW_DRAFT_VARIABLE_WITHOUT_VALUE_FIELDS` /
+# `_WORKFLOW_DRAFT_VARIABLE_FIELDS`.
+def _serialize_variable_without_value(variable: WorkflowDraftVariable) -> dict[str, Any]:
+    return {
+        "id": variable.id,
+        "type": variable.get_variable_type().value,
+        "name": variable.name,
+        "description": variable.description,
+        "selector": variable.get_selector(),
+        "value_type": _serialize_variable_type(variable),
+        "edited": variable.edited,
+        "visible": variable.visible,
+    }
+
+
+def _serialize_variable(variable: WorkflowDraftVariable) -> dict[str, Any]:
+    serialized = _serialize_variable_without_value(variable)
+    serialized["value"] = _serialize_var_value(variable)
+    return serialized
+
+
+def _serialize_variable_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Row-mapping counterpart of `_serialize_variable_without_value`.
+
+    Used with the Core rows returned by `list_variables_without_values`, which
+    carry raw column values instead of ORM instances.
+    """
+    return {
+        "id": row["id"],
+        "type": DraftVariableType.from_node_id(row["node_id"]).value,
+        "name": row["name"],
+        "description": row["description"],
+        "selector": json.loads(row["selector"]),
+        "value_type": row["value_type"].exposed_type().value,
+        "edited": row["last_edited_at"] is not None,
+        "visible": row["visible"],
+    }
+
+
+def _json_response(payload: Any) -> Response:
+    return Response(orjson.dumps(payload), mimetype="application/json")
+
+
+def _compute_list_etag(app_id: str, fingerprint: Sequence[Any], request_key: Sequence[Any]) -> str:
+    """Build an ETag for a variable list response.
+
+    `fingerprint` captures the state of the underlying rows (see
+    `WorkflowDraftVariableService.get_variables_fingerprint`) and
+    `request_key` the request parameters the response varies on (page, limit,
+    cursor, ...), so the tag changes iff the response body would.
+    """
+    return hashlib.sha256(orjson.dumps([app_id, list(fingerprint), list(request_key)])).hexdigest()
+
+
+def _not_modified_response(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _stream_variable_list_response(
+    variables: Sequence[Any],
+    serializer: Callable[[Any], dict[str, Any]],
+    tail_fields: dict[str, Any],
+) -> Response:
+    """Stream a variable list as a JSON object, one row per chunk.
+
+    Rows are encoded and written out individually instead of materializing the
+    whole payload, which keeps peak memory proportional to a single row and
+    lets the client start reading before the last row is serialized.
+    `tail_fields` are appended after the `items` array (e.g. `has_more`).
+    """
+
+    def generate():
+        yield b'{"items":['
+        for i, variable in enumerate(variables):
+            if i:
+                yield b","
+            yield orjson.dumps(serializer(variable))
+        yield b"]"
+        for key, tail_value in tail_fields.items():
+            yield b"," + orjson.dumps(key) + b":" + orjson.dumps(tail_value)
+        yield b"}"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+# NOTE: All fields below are pre-instantiated. `flask_restful.marshal` calls
+# `cls()` for every field given as a bare class, once per key per item, which
+# is pure allocation overhead on list responses with hundreds of rows.
 _WORKFLOW_DRAFT_VARIABLE_WITHOUT_VALUE_FIELDS = {
-    "id": fields.String,
+    "id": fields.String(),
     "type": fields.String(attribute=lambda model: model.get_variable_type()),
-    "name": fields.String,
-    "description": fields.String,
-    "selector": fields.List(fields.String, attribute=lambda model: model.get_selector()),
+    "name": fields.String(),
+    "description": fields.String(),
+    "selector": fields.List(fields.String(), attribute=lambda model: model.get_selector()),
     "value_type": fields.String(attribute=_serialize_variable_type),
     "edited": fields.Boolean(attribute=lambda model: model.edited),
-    "visible": fields.Boolean,
+    "visible": fields.Boolean(),
 }
 
 _WORKFLOW_DRAFT_VARIABLE_FIELDS = dict(
@@ -90,14 +241,14 @@ _WORKFLOW_DRAFT_VARIABLE_FIELDS = dict(
 )
 
 _WORKFLOW_DRAFT_ENV_VARIABLE_FIELDS = {
-    "id": fields.String,
+    "id": fields.String(),
     "type": fields.String(attribute=lambda _: "env"),
-    "name": fields.String,
-    "description": fields.String,
-    "selector": fields.List(fields.String, attribute=lambda model: model.get_selector()),
+    "name": fields.String(),
+    "description": fields.String(),
+    "selector": fields.List(fields.String(), attribute=lambda model: model.get_selector()),
     "value_type": fields.String(attribute=_serialize_variable_type),
     "edited": fields.Boolean(attribute=lambda model: model.edited),
-    "visible": fields.Boolean,
+    "visible": fields.Boolean(),
 }
 
 _WORKFLOW_DRAFT_ENV_VARIABLE_LIST_FIELDS = {
@@ -109,11 +260,6 @@ def _get_items(var_list: WorkflowDraftVariableList) -> list[WorkflowDraftVariabl
     return var_list.variables
 
 
-_WORKFLOW_DRAFT_VARIABLE_LIST_WITHOUT_VALUE_FIELDS = {
-    "items": fields.List(fields.Nested(_WORKFLOW_DRAFT_VARIABLE_WITHOUT_VALUE_FIELDS), attribute=_get_items),
-    "total": fields.Raw(),
-}
-
 _WORKFLOW_DRAFT_VARIABLE_LIST_FIELDS = {
     "items": fields.List(fields.Nested(_WORKFLOW_DRAFT_VARIABLE_FIELDS), attribute=_get_items),
 }
@@ -135,7 +281,12 @@ def _api_prerequisite(f):
     @account_initialization_required
     @get_app_model(mode=[AppMode.ADVANCED_CHAT, AppMode.WORKFLOW])
     def wrapper(*args, **kwargs):
-        if not current_user.is_editor:
+        # `current_user` is a LocalProxy; resolve it once instead of paying the
+        # proxy lookup per attribute access. `is_editor` itself is a pure
+        # in-memory role check — the login loader populates the role once per
+        # request — so no further caching is warranted.
+        user = current_user._get_current_object()
+        if not user.is_editor:
             raise Forbidden()
         return f(*args, **kwargs)
 
@@ -144,13 +295,16 @@ def _api_prerequisite(f):
 
 class WorkflowVariableCollectionApi(Resource):
     @_api_prerequisite
-    @marshal_with(_WORKFLOW_DRAFT_VARIABLE_LIST_WITHOUT_VALUE_FIELDS)
     def get(self, app_model: App):
         """
         Get draft workflow
         """
-        parser = _create_pagination_parser()
-        args = parser.parse_args()
+        args = _PAGINATION_PARSER.parse_args()
+        after = _decode_cursor(args.cursor) if args.cursor else None
+        if after is None and args.page * args.limit > _MAX_OFFSET_ROWS:
+            raise InvalidArgumentError(
+                description=f"page * limit must not exceed {_MAX_OFFSET_ROWS}, use cursor pagination for deeper pages",
+            )
 
         # fetch draft workflow by app_model
         workflow_service = WorkflowService()
@@ -158,18 +312,49 @@ class WorkflowVariableCollectionApi(Resource):
         if not workflow_exist:
             raise DraftWorkflowNotExist()
 
-        # fetch draft workflow by app_model
-        with Session(bind=db.engine, expire_on_commit=False) as session:
-            draft_var_srv = WorkflowDraftVariableService(
-                session=session,
+        draft_var_srv = WorkflowDraftVariableService(
+            session=db.session(),
+        )
+        # The editor polls this endpoint even when nothing changed; a cheap
+        # aggregate fingerprint lets those requests short-circuit with a 304
+        # before the listing query and serialization run at all.
+        with stage("etag"):
+            fingerprint = draft_var_srv.get_variables_fingerprint(app_model.id)
+            etag = _compute_list_etag(
+                app_model.id,
+                fingerprint,
+                (args.page, args.limit, args.cursor, args.include_total),
             )
+            if request.if_none_match.contains(etag):
+                return _not_modified_response(etag)
+
+        with stage("db"):
             workflow_vars = draft_var_srv.list_variables_without_values(
                 app_id=app_model.id,
                 page=args.page,
                 limit=args.limit,
+                after=after,
+                include_total=args.include_total,
             )
 
-        return workflow_vars
+        next_cursor = None
+        if workflow_vars.has_more and workflow_vars.rows:
+            last_row = workflow_vars.rows[-1]
+            next_cursor = _encode_cursor(last_row["created_at"], last_row["id"])
+
+        tail_fields: dict[str, Any] = {
+            "has_more": workflow_vars.has_more,
+            "next_cursor": next_cursor,
+        }
+        if args.include_total:
+            tail_fields["total"] = workflow_vars.total
+        response = _stream_variable_list_response(
+            workflow_vars.rows,
+            _serialize_variable_row,
+            tail_fields,
+        )
+        response.set_etag(etag)
+        return response
 
     @_api_prerequisite
     def delete(self, app_model: App):
@@ -181,11 +366,18 @@ class WorkflowVariableCollectionApi(Resource):
         return Response("", 204)
 
 
-def validate_node_id(node_id: str) -> NoReturn | None:
-    if node_id in [
+# Node ids reserved for conversation and system variables, which have dedicated
+# APIs. A module-level frozenset avoids rebuilding the collection on every check.
+_RESERVED_NODE_IDS = frozenset(
+    {
         CONVERSATION_VARIABLE_NODE_ID,
         SYSTEM_VARIABLE_NODE_ID,
-    ]:
+    }
+)
+
+
+def validate_node_id(node_id: str) -> NoReturn | None:
+    if node_id in _RESERVED_NODE_IDS:
         # NOTE(QuantumGhost): While we store the system and conversation variables as node variables
         # with specific `node_id` in database, we still want to make the API separated. By disallowing
         # accessing system and conversation variables in `WorkflowDraftNodeVariableListApi`,
@@ -201,16 +393,18 @@ def validate_node_id(node_id: str) -> NoReturn | None:
 
 class NodeVariableCollectionApi(Resource):
     @_api_prerequisite
-    @marshal_with(_WORKFLOW_DRAFT_VARIABLE_LIST_FIELDS)
     def get(self, app_model: App, node_id: str):
         validate_node_id(node_id)
-        with Session(bind=db.engine, expire_on_commit=False) as session:
-            draft_var_srv = WorkflowDraftVariableService(
-                session=session,
-            )
+        draft_var_srv = WorkflowDraftVariableService(
+            session=db.session(),
+        )
+        with stage("db"):
             node_vars = draft_var_srv.list_node_variables(app_model.id, node_id)
 
-        return node_vars
+        # Node variable lists are not paginated, so stream them row by row.
+        # No ETag here: the payload embeds freshly signed file URLs whose
+        # signatures expire, so a 304 could leave clients with stale links.
+        return _stream_variable_list_response(node_vars.variables, _serialize_variable, {})
 
     @_api_prerequisite
     def delete(self, app_model: App, node_id: str):
@@ -225,17 +419,21 @@ class VariableApi(Resource):
     _PATCH_NAME_FIELD = "name"
     _PATCH_VALUE_FIELD = "value"
 
+    # Built once at class definition; see the note on `_PAGINATION_PARSER`.
+    _PATCH_PARSER = reqparse.RequestParser()
+    _PATCH_PARSER.add_argument(_PATCH_NAME_FIELD, type=str, required=False, nullable=True, location="json")
+    # Parse 'value' field as-is to maintain its original data structure
+    _PATCH_PARSER.add_argument(_PATCH_VALUE_FIELD, type=lambda x: x, required=False, nullable=True, location="json")
+
     @_api_prerequisite
     @marshal_with(_WORKFLOW_DRAFT_VARIABLE_FIELDS)
     def get(self, app_model: App, variable_id: str):
         draft_var_srv = WorkflowDraftVariableService(
             session=db.session(),
         )
-        variable = draft_var_srv.get_variable(variable_id=variable_id)
+        variable = draft_var_srv.get_variable_for_app(app_id=app_model.id, variable_id=variable_id)
         if variable is None:
             raise NotFoundError(description=f"variable not found, id={variable_id}")
-        if variable.app_id != app_model.id:
-            raise NotFoundError(description=f"variable not found, id={variable_id}")
         return variable
 
     @_api_prerequisite
@@ -262,21 +460,14 @@ class VariableApi(Resource):
         #         "upload_file_id": "1602650a-4fe4-423c-85a2-af76c083e3c4"
         #     }
 
-        parser = reqparse.RequestParser()
-        parser.add_argument(self._PATCH_NAME_FIELD, type=str, required=False, nullable=True, location="json")
-        # Parse 'value' field as-is to maintain its original data structure
-        parser.add_argument(self._PATCH_VALUE_FIELD, type=lambda x: x, required=False, nullable=True, location="json")
-
         draft_var_srv = WorkflowDraftVariableService(
             session=db.session(),
         )
-        args = parser.parse_args(strict=True)
+        args = self._PATCH_PARSER.parse_args(strict=True)
 
-        variable = draft_var_srv.get_variable(variable_id=variable_id)
+        variable = draft_var_srv.get_variable_for_app(app_id=app_model.id, variable_id=variable_id)
         if variable is None:
             raise NotFoundError(description=f"variable not found, id={variable_id}")
-        if variable.app_id != app_model.id:
-            raise NotFoundError(description=f"variable not found, id={variable_id}")
 
         new_name = args.get(self._PATCH_NAME_FIELD, None)
         raw_value = args.get(self._PATCH_VALUE_FIELD, None)
@@ -296,7 +487,10 @@ class VariableApi(Resource):
                     raise InvalidArgumentError(description=f"expected dict for files[0], got {type(raw_value)}")
                 raw_value = build_from_mappings(mappings=raw_value, tenant_id=app_model.tenant_id)
             new_value = build_segment_with_type(variable.value_type, raw_value)
-        draft_var_srv.update_variable(variable, name=new_name, value=new_value)
+        try:
+            variable = draft_var_srv.update_variable(variable, name=new_name, value=new_value)
+        except VariableNotFoundError:
+            raise NotFoundError(description=f"variable not found, id={variable_id}")
         db.session.commit()
         return variable
 
@@ -305,11 +499,9 @@ class VariableApi(Resource):
         draft_var_srv = WorkflowDraftVariableService(
             session=db.session(),
         )
-        variable = draft_var_srv.get_variable(variable_id=variable_id)
+        variable = draft_var_srv.get_variable_for_app(app_id=app_model.id, variable_id=variable_id)
         if variable is None:
             raise NotFoundError(description=f"variable not found, id={variable_id}")
-        if variable.app_id != app_model.id:
-            raise NotFoundError(description=f"variable not found, id={variable_id}")
         draft_var_srv.delete_variable(variable)
         db.session.commit()
         return Response("", 204)
@@ -328,11 +520,9 @@ class VariableResetApi(Resource):
             raise NotFoundError(
                 f"Draft workflow not found, app_id={app_model.id}",
             )
-        variable = draft_var_srv.get_variable(variable_id=variable_id)
+        variable = draft_var_srv.get_variable_for_app(app_id=app_model.id, variable_id=variable_id)
         if variable is None:
             raise NotFoundError(description=f"variable not found, id={variable_id}")
-        if variable.app_id != app_model.id:
-            raise NotFoundError(description=f"variable not found, id={variable_id}")
 
         resetted = draft_var_srv.reset_variable(draft_workflow, variable)
         db.session.commit()
@@ -343,16 +533,15 @@ class VariableResetApi(Resource):
 
 
 def _get_variable_list(app_model: App, node_id) -> WorkflowDraftVariableList:
-    with Session(bind=db.engine, expire_on_commit=False) as session:
-        draft_var_srv = WorkflowDraftVariableService(
-            session=session,
-        )
-        if node_id == CONVERSATION_VARIABLE_NODE_ID:
-            draft_vars = draft_var_srv.list_conversation_variables(app_model.id)
-        elif node_id == SYSTEM_VARIABLE_NODE_ID:
-            draft_vars = draft_var_srv.list_system_variables(app_model.id)
-        else:
-            draft_vars = draft_var_srv.list_node_variables(app_id=app_model.id, node_id=node_id)
+    draft_var_srv = WorkflowDraftVariableService(
+        session=db.session(),
+    )
+    if node_id == CONVERSATION_VARIABLE_NODE_ID:
+        draft_vars = draft_var_srv.list_conversation_variables(app_model.id)
+    elif node_id == SYSTEM_VARIABLE_NODE_ID:
+        draft_vars = draft_var_srv.list_system_variables(app_model.id)
+    else:
+        draft_vars = draft_var_srv.list_node_variables(app_id=app_model.id, node_id=node_id)
     return draft_vars
 
 
@@ -366,10 +555,14 @@ class ConversationVariableCollectionApi(Resource):
         draft_workflow = workflow_srv.get_draft_workflow(app_model)
         if draft_workflow is None:
             raise NotFoundError(description=f"draft workflow not found, id={app_model.id}")
+        # The same session serves the prefill upsert and the listing query, so
+        # the request costs two statements on one pooled connection. The SELECT
+        # after the upsert cannot be folded into an `INSERT ... RETURNING`:
+        # `ON CONFLICT DO NOTHING` only returns rows it actually inserted.
         draft_var_srv = WorkflowDraftVariableService(db.session())
-        draft_var_srv.prefill_conversation_variable_default_values(draft_workflow)
-        db.session.commit()
-        return _get_variable_list(app_model, CONVERSATION_VARIABLE_NODE_ID)
+        if draft_var_srv.prefill_conversation_variable_default_values(draft_workflow):
+            db.session.commit()
+        return draft_var_srv.list_conversation_variables(app_model.id)
 
 
 class SystemVariableCollectionApi(Resource):
@@ -391,26 +584,26 @@ class EnvironmentVariableCollectionApi(Resource):
         if workflow is None:
             raise DraftWorkflowNotExist()
 
-        env_vars = workflow.environment_variables
-        env_vars_list = []
-        for v in env_vars:
-            env_vars_list.append(
-                {
-                    "id": v.id,
-                    "type": "env",
-                    "name": v.name,
-                    "description": v.description,
-                    "selector": v.selector,
-                    "value_type": v.value_type.exposed_type().value,
-                    "value": v.value,
-                    # Do not track edited for env vars.
-                    "edited": False,
-                    "visible": True,
-                    "editable": True,
-                }
-            )
-
-        return {"items": env_vars_list}
+        # `environment_variables` is memoized on the workflow instance, so the
+        # decrypt-and-build step runs at most once per request.
+        env_vars_list = [
+            {
+                "id": v.id,
+                "type": "env",
+                "name": v.name,
+                "description": v.description,
+                "selector": v.selector,
+                "value_type": v.value_type.exposed_type().value,
+                "value": v.value,
+                # Do not track edited for env vars.
+                "edited": False,
+                "visible": True,
+                "editable": True,
+            }
+            for v in workflow.environment_variables
+        ]
+
+        return _json_response({"items": env_vars_list})
 
 
 api.add_resource(
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+from configs import dify_config
+from dify_app import DifyApp
+
+
+@contextmanager
+def stage(name: str):
+    """Measure a named stage of the current request handler.
+
+    Usage::
+
+        with stage("db"):
+            rows = query()
+
+    Durations are accumulated on `flask.g` and flushed into a
+    `Server-Timing: db;dur=12.34, ...` response header, which browser dev
+    tools render next to each request. When the feature is disabled or no
+    request context is active, this is a no-op, so instrumented code paths
+    can be shared with celery tasks and scripts.
+    """
+    if not dify_config.ENABLE_SERVER_TIMING or not has_request_context():
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+        stages = getattr(g, "_server_timing_stages", None)
+        if stages is None:
+            stages = {}
+            g._server_timing_stages = stages
+        # Accumulate: the same stage may run several times per request
+        # (e.g. one query per loop iteration).
+        stages[name] = stages.get(name, 0.0) + elapsed_ms
+
+
+def _append_server_timing_header(response):
+    stages = getattr(g, "_server_timing_stages", None)
+    if stages:
+        response.headers["Server-Timing"] = ", ".join(f"{name};dur={duration:.2f}" for name, duration in stages.items())
+    return response
+
+
+def is_enabled() -> bool:
+    return dify_config.ENABLE_SERVER_TIMING
+
+
+def init_app(app: DifyApp):
+    app.after_request(_append_server_timing_header)
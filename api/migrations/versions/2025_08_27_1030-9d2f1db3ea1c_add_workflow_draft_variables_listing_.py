@@ -0,0 +1,34 @@
+"""add workflow_draft_variables listing index
+
+Revision ID: 9d2f1db3ea1c
+Revises: fa8b0fa6f407
+Create Date: 2025-08-27 10:30:12.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2f1db3ea1c'
+down_revision = 'fa8b0fa6f407'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite index backing the keyset-paginated listing query, which
+    # filters by `app_id` and orders by `(created_at, id)`.
+    #
+    # Node-scoped lookups are already covered by the unique constraint on
+    # `(app_id, node_id, name)`, so no additional index is created for them.
+    with op.batch_alter_table('workflow_draft_variables', schema=None) as batch_op:
+        batch_op.create_index(
+            'workflow_draft_variables_app_id_created_at_id_idx',
+            ['app_id', 'created_at', 'id'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('workflow_draft_variables', schema=None) as batch_op:
+        batch_op.drop_index('workflow_draft_variables_app_id_created_at_id_idx')
@@ -22,6 +22,21 @@ class DraftVariableType(StrEnum):
     SYS = "sys"
     CONVERSATION = "conversation"
 
+    @classmethod
+    def from_node_id(cls, node_id: str) -> "DraftVariableType":
+        """Derive the variable type from the `node_id` a draft variable is stored under.
+
+        Conversation and system variables are persisted with the reserved node ids
+        `conversation` and `sys`; anything else is a regular node variable.
+        """
+        match node_id:
+            case cls.CONVERSATION:
+                return cls.CONVERSATION
+            case cls.SYS:
+                return cls.SYS
+            case _:
+                return cls.NODE
+
 
 class MessageStatus(StrEnum):
     """
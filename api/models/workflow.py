@@ -351,6 +351,15 @@ class Workflow(Base):
         if self._environment_variables is None:
             self._environment_variables = "{}"
 
+        # Building the variables involves parsing JSON and decrypting secret
+        # values, which is costly enough to memoize for the lifetime of this
+        # instance. The setter below invalidates the cache on mutation.
+        cached: list[SecretVariable | StringVariable | IntegerVariable | FloatVariable] | None = getattr(
+            self, "_environment_variables_cache", None
+        )
+        if cached is not None:
+            return cached
+
         # Get tenant_id from current_user (Account or EndUser)
         tenant_id = extract_tenant_id(current_user)
 
@@ -374,12 +383,14 @@ class Workflow(Base):
         decrypted_results: list[SecretVariable | StringVariable | IntegerVariable | FloatVariable] = list(
             map(decrypt_func, results)
         )
+        self._environment_variables_cache = decrypted_results
         return decrypted_results
 
     @environment_variables.setter
     def environment_variables(self, value: Sequence[Variable]):
         if not value:
             self._environment_variables = "{}"
+            self._environment_variables_cache = None
             return
 
         # Get tenant_id from current_user (Account or EndUser)
@@ -387,6 +398,7 @@ class Workflow(Base):
 
         if not tenant_id:
             self._environment_variables = "{}"
+            self._environment_variables_cache = None
             return
 
         value = list(value)
@@ -413,6 +425,10 @@ class Workflow(Base):
             ensure_ascii=False,
         )
         self._environment_variables = environment_variables_json
+        # Invalidate only after the JSON is written: building
+        # `origin_variables_dictionary` above goes through the getter, which
+        # re-populates the cache with the pre-update list.
+        self._environment_variables_cache = None
 
     def to_dict(self, *, include_secret: bool = False) -> Mapping[str, Any]:
         environment_variables = list(self.environment_variables)
@@ -941,7 +957,12 @@ class WorkflowDraftVariable(Base):
         ]
 
     __tablename__ = "workflow_draft_variables"
-    __table_args__ = (UniqueConstraint(*unique_app_id_node_id_name()),)
+    __table_args__ = (
+        UniqueConstraint(*unique_app_id_node_id_name()),
+        # Covers the keyset-paginated listing query, which orders by
+        # `(created_at, id)` within an app.
+        sa.Index("workflow_draft_variables_app_id_created_at_id_idx", "app_id", "created_at", "id"),
+    )
     # Required for instance variable annotation.
     __allow_unmapped__ = True
 
@@ -1139,6 +1160,14 @@ class WorkflowDraftVariable(Base):
         self.__value = value
         return value
 
+    def invalidate_value_cache(self):
+        """Drop the cached deserialized value.
+
+        Needed after the `value` column has been rewritten outside of
+        `set_value`, e.g. by a bulk UPDATE that refreshed this instance.
+        """
+        self.__value = None
+
     def set_name(self, name: str):
         self.name = name
         self._set_selector([self.node_id, name])
@@ -1163,13 +1192,7 @@ class WorkflowDraftVariable(Base):
             return None
 
     def get_variable_type(self) -> DraftVariableType:
-        match self.node_id:
-            case DraftVariableType.CONVERSATION:
-                return DraftVariableType.CONVERSATION
-            case DraftVariableType.SYS:
-                return DraftVariableType.SYS
-            case _:
-                return DraftVariableType.NODE
+        return DraftVariableType.from_node_id(self.node_id)
 
     @classmethod
     def _new(
@@ -1,18 +1,22 @@
 import dataclasses
 import datetime
+import json
 import logging
 from collections.abc import Mapping, Sequence
 from enum import StrEnum
 from typing import Any, ClassVar
 
-from sqlalchemy import Engine, orm
+import sqlalchemy as sa
+from sqlalchemy import Engine
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.sql.expression import and_, or_
+from sqlalchemy.sql.expression import and_, or_, tuple_
 
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.file.models import File
 from core.variables import Segment, StringSegment, Variable
+from core.variables import utils as variable_utils
 from core.variables.consts import SELECTORS_LENGTH
 from core.variables.segments import ArrayFileSegment, FileSegment
 from core.variables.types import SegmentType
@@ -37,6 +41,22 @@ class WorkflowDraftVariableList:
     total: int | None = None
 
 
+@dataclasses.dataclass(frozen=True)
+class WorkflowDraftVariableRowList:
+    """Listing result carrying plain row mappings instead of ORM instances.
+
+    The without-values listing is read-only, so it skips ORM instance
+    construction (identity map, instance state) entirely; each row is a
+    dict-like `RowMapping` keyed by column name.
+    """
+
+    rows: list[RowMapping]
+    total: int | None = None
+    # Whether more rows exist after the current page. Derived from the
+    # "fetch limit+1 rows" trick, so no extra COUNT query is needed.
+    has_more: bool = False
+
+
 class WorkflowDraftVariableError(Exception):
     pass
 
@@ -49,6 +69,10 @@ class UpdateNotSupportedError(WorkflowDraftVariableError):
     pass
 
 
+class VariableNotFoundError(WorkflowDraftVariableError):
+    pass
+
+
 class DraftVarLoader(VariableLoader):
     # This implements the VariableLoader interface for loading draft variables.
     #
@@ -140,6 +164,22 @@ class WorkflowDraftVariableService:
     def get_variable(self, variable_id: str) -> WorkflowDraftVariable | None:
         return self._session.query(WorkflowDraftVariable).where(WorkflowDraftVariable.id == variable_id).first()
 
+    def get_variable_for_app(self, app_id: str, variable_id: str) -> WorkflowDraftVariable | None:
+        """Fetch a variable scoped to the given app with a single query.
+
+        Putting the `app_id` ownership filter into the WHERE clause lets the
+        database short-circuit on it, instead of loading the row first and
+        comparing `app_id` in Python as the callers used to.
+        """
+        return (
+            self._session.query(WorkflowDraftVariable)
+            .where(
+                WorkflowDraftVariable.id == variable_id,
+                WorkflowDraftVariable.app_id == app_id,
+            )
+            .first()
+        )
+
     def get_draft_variables_by_selectors(
         self,
         app_id: str,
@@ -163,22 +203,90 @@ class WorkflowDraftVariableService:
         )
         return variables
 
-    def list_variables_without_values(self, app_id: str, page: int, limit: int) -> WorkflowDraftVariableList:
+    # Columns rendered by the without-values listing. Selecting them directly
+    # (instead of mapping full ORM instances) skips `value`, which may be
+    # arbitrarily large, and the per-row `InstanceState` bookkeeping a
+    # read-only listing never needs.
+    _LISTING_COLUMNS: ClassVar[tuple] = (
+        WorkflowDraftVariable.id,
+        WorkflowDraftVariable.created_at,
+        WorkflowDraftVariable.node_id,
+        WorkflowDraftVariable.name,
+        WorkflowDraftVariable.description,
+        WorkflowDraftVariable.selector,
+        WorkflowDraftVariable.value_type,
+        WorkflowDraftVariable.last_edited_at,
+        WorkflowDraftVariable.visible,
+    )
+
+    def list_variables_without_values(
+        self,
+        app_id: str,
+        page: int,
+        limit: int,
+        after: tuple[datetime.datetime, str] | None = None,
+        include_total: bool = False,
+    ) -> WorkflowDraftVariableRowList:
+        """List draft variables of an app without loading their values.
+
+        When `after` (the `(created_at, id)` sort key of the last row in the
+        previous page) is given, keyset pagination is used and `page` is ignored.
+        Unlike OFFSET pagination, each keyset page costs O(limit) regardless of
+        how deep the page is.
+
+        `total` is only computed when `include_total` is set, since the COUNT
+        query it requires is as expensive as the listing query itself. Callers
+        should rely on `has_more` instead where possible.
+        """
         criteria = WorkflowDraftVariable.app_id == app_id
         total = None
-        query = self._session.query(WorkflowDraftVariable).where(criteria)
-        if page == 1:
-            total = query.count()
-        variables = (
-            # Do not load the `value` field.
-            query.options(orm.defer(WorkflowDraftVariable.value))
-            .order_by(WorkflowDraftVariable.created_at.desc())
-            .limit(limit)
-            .offset((page - 1) * limit)
-            .all()
+        if include_total and after is None:
+            total = self._session.query(WorkflowDraftVariable).where(criteria).count()
+        stmt = (
+            sa.select(*self._LISTING_COLUMNS)
+            .where(criteria)
+            # `id` breaks ties between rows sharing the same `created_at`, which is
+            # required for the keyset predicate below to be a stable total order.
+            .order_by(WorkflowDraftVariable.created_at.desc(), WorkflowDraftVariable.id.desc())
         )
+        if after is not None:
+            stmt = stmt.where(tuple_(WorkflowDraftVariable.created_at, WorkflowDraftVariable.id) < after)
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+        # Fetch one extra row to detect whether a next page exists without
+        # issuing a COUNT query.
+        rows = list(self._session.execute(stmt.limit(limit + 1)).mappings())
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
 
-        return WorkflowDraftVariableList(variables=variables, total=total)
+        return WorkflowDraftVariableRowList(rows=rows, total=total, has_more=has_more)
+
+    def get_variables_fingerprint(
+        self,
+        app_id: str,
+        node_id: str | None = None,
+    ) -> tuple[int, datetime.datetime | None, datetime.datetime | None]:
+        """Return a cheap change fingerprint of an app's draft variables.
+
+        The fingerprint is `(count, max(created_at), max(updated_at))`:
+        inserts and deletes change the count, upserts refresh `created_at`,
+        and `updated_at` has an `onupdate` default that fires on every UPDATE
+        — including edits and resets, which would be invisible to
+        `last_edited_at` (a reset clears it back to `None`). Computing the
+        fingerprint is a single aggregate, far cheaper than listing and
+        serializing the variables — callers use it for `ETag`-based
+        conditional GETs.
+        """
+        stmt = sa.select(
+            sa.func.count(),
+            sa.func.max(WorkflowDraftVariable.created_at),
+            sa.func.max(WorkflowDraftVariable.updated_at),
+        ).where(WorkflowDraftVariable.app_id == app_id)
+        if node_id is not None:
+            stmt = stmt.where(WorkflowDraftVariable.node_id == node_id)
+        count, max_created_at, max_updated_at = self._session.execute(stmt).one()
+        return count, max_created_at, max_updated_at
 
     def _list_node_variables(self, app_id: str, node_id: str) -> WorkflowDraftVariableList:
         criteria = (
@@ -225,15 +333,44 @@ class WorkflowDraftVariableService:
         name: str | None = None,
         value: Segment | None = None,
     ) -> WorkflowDraftVariable:
+        """Persist a name and / or value change with a single UPDATE statement.
+
+        The UPDATE carries the `app_id` guard in its WHERE clause and uses
+        RETURNING to refresh the in-session instance, so the write costs one
+        round-trip and cannot touch a row that has been deleted or belongs to
+        another app in the meantime.
+
+        Raises:
+            VariableNotFoundError: If no matching row exists anymore.
+        """
         if not variable.editable:
             raise UpdateNotSupportedError(f"variable not support updating, id={variable.id}")
+        values: dict[str, Any] = {
+            "last_edited_at": datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+        }
         if name is not None:
-            variable.set_name(name)
+            values["name"] = name
+            values["selector"] = json.dumps(list(variable_utils.to_selector(variable.node_id, name)))
         if value is not None:
-            variable.set_value(value)
-        variable.last_edited_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
-        self._session.flush()
-        return variable
+            values["value"] = variable_utils.dumps_with_segments(value)
+            values["value_type"] = value.value_type
+        stmt = (
+            sa.update(WorkflowDraftVariable)
+            .where(
+                WorkflowDraftVariable.id == variable.id,
+                WorkflowDraftVariable.app_id == variable.app_id,
+            )
+            .values(**values)
+            .returning(WorkflowDraftVariable)
+            .execution_options(populate_existing=True)
+        )
+        updated = self._session.scalars(stmt).one_or_none()
+        if updated is None:
+            raise VariableNotFoundError(f"variable not found, id={variable.id}")
+        # `populate_existing` refreshed the column attributes, but the
+        # deserialized segment cached on the instance may now be stale.
+        updated.invalidate_value_cache()
+        return updated
 
     def _reset_conv_var(self, workflow: Workflow, variable: WorkflowDraftVariable) -> WorkflowDraftVariable | None:
         conv_var_by_name = {i.name: i for i in workflow.conversation_variables}
@@ -326,20 +463,24 @@ class WorkflowDraftVariableService:
         self._session.delete(variable)
 
     def delete_workflow_variables(self, app_id: str):
-        (
-            self._session.query(WorkflowDraftVariable)
+        self._session.execute(
+            sa.delete(WorkflowDraftVariable)
             .where(WorkflowDraftVariable.app_id == app_id)
-            .delete(synchronize_session=False)
+            .execution_options(synchronize_session=False)
         )
 
     def delete_node_variables(self, app_id: str, node_id: str):
         return self._delete_node_variables(app_id, node_id)
 
     def _delete_node_variables(self, app_id: str, node_id: str):
-        self._session.query(WorkflowDraftVariable).where(
-            WorkflowDraftVariable.app_id == app_id,
-            WorkflowDraftVariable.node_id == node_id,
-        ).delete()
+        self._session.execute(
+            sa.delete(WorkflowDraftVariable)
+            .where(
+                WorkflowDraftVariable.app_id == app_id,
+                WorkflowDraftVariable.node_id == node_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
     def _get_conversation_id_from_draft_variable(self, app_id: str) -> str | None:
         draft_var = self._get_variable(
@@ -411,10 +552,19 @@ class WorkflowDraftVariableService:
         self._session.flush()
         return conversation.id
 
-    def prefill_conversation_variable_default_values(self, workflow: Workflow):
-        """"""
+    def prefill_conversation_variable_default_values(self, workflow: Workflow) -> bool:
+        """Seed draft conversation variables from the workflow's declarations.
+
+        Issues a single `INSERT ... ON CONFLICT DO NOTHING`, so existing rows
+        are left untouched. Returns whether an upsert was issued at all,
+        letting callers skip the commit round-trip when the workflow declares
+        no conversation variables.
+        """
+        conversation_variables = workflow.conversation_variables
+        if not conversation_variables:
+            return False
         draft_conv_vars: list[WorkflowDraftVariable] = []
-        for conv_var in workflow.conversation_variables:
+        for conv_var in conversation_variables:
             draft_var = WorkflowDraftVariable.new_conversation_variable(
                 app_id=workflow.app_id,
                 name=conv_var.name,
@@ -427,6 +577,7 @@ class WorkflowDraftVariableService:
             draft_conv_vars,
             policy=_UpsertPolicy.IGNORE,
         )
+        return True
 
 
 class _UpsertPolicy(StrEnum):
@@ -5,6 +5,7 @@ from collections.abc import Callable, Generator, Mapping, Sequence
 from typing import Any, Optional, cast
 from uuid import uuid4
 
+from flask import g, has_request_context
 from sqlalchemy import select
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -101,6 +102,14 @@ class WorkflowService:
         """
         Get draft workflow
         """
+        # Hot console pages resolve the same draft workflow from several code
+        # paths within one request cycle; memoize the lookup on `flask.g` so
+        # each request issues the SELECT at most once. Mutations go through
+        # `sync_draft_workflow`, which refreshes the cached entry.
+        cache = self._request_draft_workflow_cache()
+        if cache is not None and app_model.id in cache:
+            return cache[app_model.id]
+
         # fetch draft workflow by app_model
         workflow = (
             db.session.query(Workflow)
@@ -112,9 +121,27 @@ class WorkflowService:
             .first()
         )
 
+        if cache is not None:
+            cache[app_model.id] = workflow
+
         # return draft workflow
         return workflow
 
+    @staticmethod
+    def _request_draft_workflow_cache() -> Optional[dict[str, Optional[Workflow]]]:
+        """Return the per-request draft workflow cache, or None outside a request.
+
+        Celery workers and scripts call the service without a request context;
+        they simply skip memoization.
+        """
+        if not has_request_context():
+            return None
+        cache = getattr(g, "_draft_workflow_cache", None)
+        if cache is None:
+            cache = {}
+            g._draft_workflow_cache = cache
+        return cache
+
     def get_published_workflow_by_id(self, app_model: App, workflow_id: str) -> Optional[Workflow]:
         # fetch published workflow by workflow_id
         workflow = (
@@ -244,6 +271,11 @@ class WorkflowService:
         # commit db session changes
         db.session.commit()
 
+        # keep the per-request cache in sync with the freshly written draft
+        cache = self._request_draft_workflow_cache()
+        if cache is not None:
+            cache[app_model.id] = workflow
+
         # trigger app workflow events
         app_draft_workflow_was_synced.send(app_model, synced_draft_workflow=workflow)
 
@@ -1,8 +1,10 @@
+import datetime
 import json
 import unittest
 import uuid
 
 import pytest
+import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 from core.variables.variables import StringVariable
@@ -88,19 +90,52 @@ class TestWorkflowDraftVariableService(unittest.TestCase):
 
     def test_list_variables(self):
         srv = self._get_test_srv()
-        var_list = srv.list_variables_without_values(self._test_app_id, page=1, limit=2)
+        var_list = srv.list_variables_without_values(self._test_app_id, page=1, limit=2, include_total=True)
         assert var_list.total == 5
-        assert len(var_list.variables) == 2
-        page1_var_ids = {v.id for v in var_list.variables}
+        assert var_list.has_more is True
+        assert len(var_list.rows) == 2
+        page1_var_ids = {r["id"] for r in var_list.rows}
         assert page1_var_ids.issubset(self._variable_ids)
 
         var_list_2 = srv.list_variables_without_values(self._test_app_id, page=2, limit=2)
         assert var_list_2.total is None
-        assert len(var_list_2.variables) == 2
-        page2_var_ids = {v.id for v in var_list_2.variables}
+        assert len(var_list_2.rows) == 2
+        page2_var_ids = {r["id"] for r in var_list_2.rows}
+        assert page2_var_ids.isdisjoint(page1_var_ids)
+        assert page2_var_ids.issubset(self._variable_ids)
+
+    def test_list_variables_with_keyset_pagination(self):
+        srv = self._get_test_srv()
+        var_list = srv.list_variables_without_values(self._test_app_id, page=1, limit=2)
+        assert var_list.has_more is True
+        last_row = var_list.rows[-1]
+
+        # A keyset page after the last row of page 1 should match offset page 2.
+        var_list_2 = srv.list_variables_without_values(
+            self._test_app_id,
+            page=1,
+            limit=2,
+            after=(last_row["created_at"], last_row["id"]),
+        )
+        assert var_list_2.total is None
+        assert len(var_list_2.rows) == 2
+        assert var_list_2.has_more is True
+        page1_var_ids = {r["id"] for r in var_list.rows}
+        page2_var_ids = {r["id"] for r in var_list_2.rows}
         assert page2_var_ids.isdisjoint(page1_var_ids)
         assert page2_var_ids.issubset(self._variable_ids)
 
+        # The final keyset page reports no further rows.
+        last_row_2 = var_list_2.rows[-1]
+        var_list_3 = srv.list_variables_without_values(
+            self._test_app_id,
+            page=1,
+            limit=2,
+            after=(last_row_2["created_at"], last_row_2["id"]),
+        )
+        assert len(var_list_3.rows) == 1
+        assert var_list_3.has_more is False
+
     def test_get_node_variable(self):
         srv = self._get_test_srv()
         node_var = srv.get_node_variable(self._test_app_id, self._node1_id, "str_var")
@@ -499,3 +534,31 @@ class TestWorkflowDraftVariableServiceResetVariable(unittest.TestCase):
 
         assert "cannot reset system variable" in str(exc_info.value)
         assert sys_var.id in str(exc_info.value)
+
+    def test_reset_variable_changes_fingerprint(self):
+        """Resetting a variable must change the listing fingerprint.
+
+        A reset clears `last_edited_at` without touching the row count or
+        `created_at`; the fingerprint relies on the `updated_at` bump, so a
+        conditional GET after a reset must not be answered with 304.
+        """
+        srv = self._get_test_srv()
+        mock_workflow = self._create_mock_workflow()
+
+        # Age all rows so the reset's `updated_at` bump is observable: within
+        # one transaction `current_timestamp` is fixed at transaction start.
+        past = datetime_utils.naive_utc_now() - datetime.timedelta(hours=1)
+        self._session.execute(
+            sa.update(WorkflowDraftVariable)
+            .where(WorkflowDraftVariable.app_id == self._test_app_id)
+            .values(created_at=past, updated_at=past)
+            .execution_options(synchronize_session=False)
+        )
+        fingerprint_before = srv.get_variables_fingerprint(self._test_app_id)
+
+        variable = srv.get_variable(self._conv_var_id)
+        assert variable is not None
+        srv.reset_variable(mock_workflow, variable)
+
+        fingerprint_after = srv.get_variables_fingerprint(self._test_app_id)
+        assert fingerprint_after != fingerprint_before
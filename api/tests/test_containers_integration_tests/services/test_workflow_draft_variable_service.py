@@ -290,14 +290,14 @@ class TestWorkflowDraftVariableService:
                 fake=fake,
             )
         service = WorkflowDraftVariableService(db_session_with_containers)
-        result = service.list_variables_without_values(app.id, page=1, limit=3)
+        result = service.list_variables_without_values(app.id, page=1, limit=3, include_total=True)
         assert result.total == 5
-        assert len(result.variables) == 3
-        assert result.variables[0].created_at >= result.variables[1].created_at
-        assert result.variables[1].created_at >= result.variables[2].created_at
-        for var in result.variables:
-            assert var.name is not None
-            assert var.app_id == app.id
+        assert result.has_more is True
+        assert len(result.rows) == 3
+        assert result.rows[0]["created_at"] >= result.rows[1]["created_at"]
+        assert result.rows[1]["created_at"] >= result.rows[2]["created_at"]
+        for row in result.rows:
+            assert row["name"] is not None
 
     def test_list_node_variables_success(self, db_session_with_containers, mock_external_service_dependencies):
         """
@@ -1,16 +1,23 @@
+import base64
 import datetime
 import uuid
 from collections import OrderedDict
-from typing import Any, NamedTuple
+from typing import Any
 
+import pytest
 from flask_restful import marshal
 
 from controllers.console.app.workflow_draft_variable import (
     _WORKFLOW_DRAFT_VARIABLE_FIELDS,
     _WORKFLOW_DRAFT_VARIABLE_LIST_FIELDS,
-    _WORKFLOW_DRAFT_VARIABLE_LIST_WITHOUT_VALUE_FIELDS,
     _WORKFLOW_DRAFT_VARIABLE_WITHOUT_VALUE_FIELDS,
+    _decode_cursor,
+    _encode_cursor,
+    _serialize_variable,
+    _serialize_variable_row,
+    _serialize_variable_without_value,
 )
+from controllers.web.error import InvalidArgumentError
 from core.workflow.constants import CONVERSATION_VARIABLE_NODE_ID, SYSTEM_VARIABLE_NODE_ID
 from factories.variable_factory import build_segment
 from models.workflow import WorkflowDraftVariable
@@ -109,13 +116,34 @@ class TestWorkflowDraftVariableFields:
         assert marshal(node_var, _WORKFLOW_DRAFT_VARIABLE_FIELDS) == expected_with_value
 
 
-class TestWorkflowDraftVariableList:
-    def test_workflow_draft_variable_list(self):
-        class TestCase(NamedTuple):
-            name: str
-            var_list: WorkflowDraftVariableList
-            expected: dict
+class TestVariableSerializers:
+    def test_serialize_variable_without_value_matches_marshal(self):
+        node_var = WorkflowDraftVariable.new_node_variable(
+            app_id=_TEST_APP_ID,
+            node_id="test_node",
+            name="test_var",
+            value=build_segment("a"),
+            visible=True,
+            node_execution_id=_TEST_NODE_EXEC_ID,
+        )
+        node_var.id = str(uuid.uuid4())
 
+        serialized = _serialize_variable_without_value(node_var)
+        assert serialized == {
+            "id": str(node_var.id),
+            "type": node_var.get_variable_type().value,
+            "name": "test_var",
+            "description": "",
+            "selector": ["test_node", "test_var"],
+            "value_type": "string",
+            "edited": False,
+            "visible": True,
+        }
+        # The plain-dict serializer must stay in sync with the marshal fields
+        # still used by the single-variable endpoints.
+        assert serialized == dict(marshal(node_var, _WORKFLOW_DRAFT_VARIABLE_WITHOUT_VALUE_FIELDS))
+
+    def test_serialize_variable_row_matches_instance_serializer(self):
         node_var = WorkflowDraftVariable.new_node_variable(
             app_id=_TEST_APP_ID,
             node_id="test_node",
@@ -125,66 +153,58 @@ class TestWorkflowDraftVariableList:
             node_execution_id=_TEST_NODE_EXEC_ID,
         )
         node_var.id = str(uuid.uuid4())
-        node_var_dict = OrderedDict(
-            {
-                "id": str(node_var.id),
-                "type": node_var.get_variable_type().value,
-                "name": "test_var",
-                "description": "",
-                "selector": ["test_node", "test_var"],
-                "value_type": "string",
-                "edited": False,
-                "visible": True,
-            }
+
+        # Shape of the row mappings returned by `list_variables_without_values`.
+        row = {
+            "id": node_var.id,
+            "created_at": node_var.created_at,
+            "node_id": node_var.node_id,
+            "name": node_var.name,
+            "description": node_var.description,
+            "selector": node_var.selector,
+            "value_type": node_var.value_type,
+            "last_edited_at": node_var.last_edited_at,
+            "visible": node_var.visible,
+        }
+        assert _serialize_variable_row(row) == _serialize_variable_without_value(node_var)
+
+    def test_serialize_variable_matches_marshal(self):
+        conv_var = WorkflowDraftVariable.new_conversation_variable(
+            app_id=_TEST_APP_ID, name="conv_var", value=build_segment([1, "a"])
+        )
+        conv_var.id = str(uuid.uuid4())
+
+        serialized = _serialize_variable(conv_var)
+        assert serialized["value"] == [1, "a"]
+        assert serialized == dict(marshal(conv_var, _WORKFLOW_DRAFT_VARIABLE_FIELDS))
+
+
+class TestPaginationCursor:
+    def test_cursor_round_trip(self):
+        conv_var = WorkflowDraftVariable.new_conversation_variable(
+            app_id=_TEST_APP_ID, name="conv_var", value=build_segment(1)
         )
+        conv_var.id = str(uuid.uuid4())
 
-        cases = [
-            TestCase(
-                name="empty variable list",
-                var_list=WorkflowDraftVariableList(variables=[]),
-                expected=OrderedDict(
-                    {
-                        "items": [],
-                        "total": None,
-                    }
-                ),
-            ),
-            TestCase(
-                name="empty variable list with total",
-                var_list=WorkflowDraftVariableList(variables=[], total=10),
-                expected=OrderedDict(
-                    {
-                        "items": [],
-                        "total": 10,
-                    }
-                ),
-            ),
-            TestCase(
-                name="non-empty variable list",
-                var_list=WorkflowDraftVariableList(variables=[node_var], total=None),
-                expected=OrderedDict(
-                    {
-                        "items": [node_var_dict],
-                        "total": None,
-                    }
-                ),
-            ),
-            TestCase(
-                name="non-empty variable list with total",
-                var_list=WorkflowDraftVariableList(variables=[node_var], total=10),
-                expected=OrderedDict(
-                    {
-                        "items": [node_var_dict],
-                        "total": 10,
-                    }
-                ),
-            ),
-        ]
-
-        for idx, case in enumerate(cases, 1):
-            assert marshal(case.var_list, _WORKFLOW_DRAFT_VARIABLE_LIST_WITHOUT_VALUE_FIELDS) == case.expected, (
-                f"Test case {idx} failed, {case.name=}"
-            )
+        cursor = _encode_cursor(conv_var.created_at, conv_var.id)
+        created_at, variable_id = _decode_cursor(cursor)
+        assert created_at == conv_var.created_at
+        assert variable_id == conv_var.id
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not-a-valid-cursor",
+            # valid base64 of structurally wrong payloads
+            base64.urlsafe_b64encode(b"5").decode(),
+            base64.urlsafe_b64encode(b"[1, 2]").decode(),
+            base64.urlsafe_b64encode(b'[null, "x"]').decode(),
+            base64.urlsafe_b64encode(b'["not-a-timestamp", "x"]').decode(),
+        ],
+    )
+    def test_decode_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidArgumentError):
+            _decode_cursor(cursor)
 
 
 def test_workflow_node_variables_fields():
@@ -72,26 +72,22 @@ export const fetchCurrentValueOfConversationVariable: Fetcher<ConversationVariab
   return get<ConversationVariableResponse>(url, { params })
 }
 
-const fetchAllInspectVarsOnePage = async (appId: string, page: number): Promise<{ total: number, items: VarInInspect[] }> => {
+const fetchAllInspectVarsOnePage = async (appId: string, cursor?: string): Promise<{ items: VarInInspect[], has_more: boolean, next_cursor: string | null }> => {
   return get(`apps/${appId}/workflows/draft/variables`, {
-    params: { page, limit: 100 },
+    params: cursor ? { limit: 100, cursor } : { limit: 100 },
   })
 }
 export const fetchAllInspectVars = async (appId: string): Promise<VarInInspect[]> => {
-  const res = await fetchAllInspectVarsOnePage(appId, 1)
-  const { items, total } = res
-  if (total <= 100)
-    return items
-
-  const pageCount = Math.ceil(total / 100)
-  const promises = []
-  for (let i = 2; i <= pageCount; i++)
-    promises.push(fetchAllInspectVarsOnePage(appId, i))
-
-  const restData = await Promise.all(promises)
-  restData.forEach(({ items: item }) => {
-    items.push(...item)
-  })
+  const items: VarInInspect[] = []
+  let cursor: string | undefined
+  // Follow the server's cursor instead of fanning out page numbers: keyset
+  // pages stay cheap at any depth and are not subject to the OFFSET cap,
+  // and no COUNT query is needed to size the fetch.
+  do {
+    const res = await fetchAllInspectVarsOnePage(appId, cursor)
+    items.push(...res.items)
+    cursor = (res.has_more && res.next_cursor) ? res.next_cursor : undefined
+  } while (cursor)
   return items
 }
 